@@ -1,4 +1,62 @@
+import os
 from pathlib import Path
 
+import pytest
+
+from autotest.dfn_helpers import MF6_OWNER, MF6_REF, MF6_REPO, fetch_test_dfns, has_dfns
+
 pytest_plugins = ["modflow_devtools.fixtures", "modflow_devtools.snapshots"]
 project_root_path = Path(__file__).parent
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-network",
+        action="store_true",
+        default=False,
+        help="Run tests marked as requiring network access.",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-network"):
+        return
+    skip_network = pytest.mark.skip(reason="needs --run-network option to run")
+    for item in items:
+        if "network" in item.keywords:
+            item.add_marker(skip_network)
+
+
+@pytest.fixture(scope="session")
+def dfn_dir() -> Path:
+    """
+    Provide path to DFN files for testing.
+
+    Priority:
+    1. If TEST_DFN_PATH is set, use the DFN directory from a cloned MF6 repo (autodiscovery)
+    2. Otherwise, fetch DFN files for TEST_DFNS_REPO/TEST_DFNS_REF to a temp directory
+
+    The autodiscovery approach is preferred in CI to avoid needing registry files.
+    """
+    # If TEST_DFN_PATH is set, use it (points to cloned MF6 DFN directory)
+    if test_dfn_path := os.getenv("TEST_DFN_PATH"):
+        dfn_path = Path(test_dfn_path).expanduser().resolve()
+        if not dfn_path.exists():
+            raise ValueError(f"TEST_DFN_PATH={test_dfn_path} does not exist")
+        if not has_dfns(dfn_path):
+            raise ValueError(f"No DFN files found in TEST_DFN_PATH={test_dfn_path}")
+        return dfn_path
+
+    owner, repo = os.getenv("TEST_DFNS_REPO", f"{MF6_OWNER}/{MF6_REPO}").split("/")
+    return fetch_test_dfns(owner, repo, os.getenv("TEST_DFNS_REF", MF6_REF))
+
+
+@pytest.fixture(scope="session")
+def loaded_spec(dfn_dir):
+    """
+    DFN specification loaded once per session from `dfn_dir`.
+    Shared between tests, so treat it as read-only.
+    """
+    from modflow_devtools.dfns import DfnSpec
+
+    return DfnSpec.load(dfn_dir)
@@ -0,0 +1,86 @@
+"""
+Helpers for tests using MODFLOW 6 DFN files. Test modules need these at
+collection time (to parametrize over components), before fixtures exist,
+so they live in a plain module instead of conftest.py.
+"""
+
+import os
+from collections.abc import Callable
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from filelock import FileLock
+
+DFN_DIR = Path(__file__).parent / "temp" / "dfn"
+MF6_OWNER = "MODFLOW-ORG"
+MF6_REPO = "modflow6"
+MF6_REF = "develop"
+
+
+def has_dfns(path: Path) -> bool:
+    """Check whether a directory contains any DFN files, stopping at the first."""
+    if not path.is_dir():
+        return False
+    with os.scandir(path) as it:
+        return any(e.name.endswith(".dfn") for e in it)
+
+
+def dfn_stems(path: Path, suffix: str = ".dfn") -> list[str]:
+    """Sorted stems of the files in `path` with the given suffix, if it exists."""
+    if not path.is_dir():
+        return []
+    with os.scandir(path) as it:
+        return sorted(e.name[: -len(suffix)] for e in it if e.name.endswith(suffix))
+
+
+def fetch_test_dfns(
+    owner: str = MF6_OWNER,
+    repo: str = MF6_REPO,
+    ref: str = MF6_REF,
+    fetch: Callable | None = None,
+) -> Path:
+    """
+    Fetch DFN files for the given repository and ref, unless already present.
+    The pinned modflow6@develop files go to `DFN_DIR`, any other source to a
+    sibling directory. A file lock keeps pytest-xdist workers from fetching
+    concurrently. Fetch errors propagate, failing the caller loudly instead
+    of silently collecting no DFN tests.
+
+    `fetch` defaults to `modflow_devtools.dfns.fetch.fetch_dfns`. The legacy
+    `modflow_devtools.dfn` tests pass its `get_dfns` to keep it covered.
+    """
+    path = DFN_DIR
+    if (owner, repo, ref) != (MF6_OWNER, MF6_REPO, MF6_REF):
+        path = DFN_DIR.with_name(f"dfn-{owner}-{repo}-{ref}".replace("/", "-"))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with FileLock(str(path.with_name(f"{path.name}.lock"))):
+        if not has_dfns(path):
+            if fetch is None:
+                from modflow_devtools.dfns.fetch import fetch_dfns
+
+                fetch = fetch_dfns
+            fetch(owner, repo, ref, path, verbose=True)
+    return path
+
+
+def convert_test_dfns(convert: Callable, outdir: Path) -> list[str]:
+    """
+    Convert the DFN files in `DFN_DIR` to TOML files in `outdir` with the
+    given converter, unless every DFN already has a TOML file there, and
+    return the TOML stems. The check and conversion happen under a file
+    lock, so pytest-xdist workers convert at most once between them. The
+    conversion goes to a temporary directory that is then moved into place,
+    so the directory never holds a partial conversion.
+    """
+    dfn_names = [stem for stem in dfn_stems(DFN_DIR) if stem not in ["common", "flopy"]]
+    outdir.parent.mkdir(parents=True, exist_ok=True)
+    with FileLock(str(outdir.with_name(f"{outdir.name}.lock"))):
+        if not set(dfn_stems(outdir, ".toml")).issuperset(dfn_names):
+            tmpdir = Path(mkdtemp(prefix=f".{outdir.name}-", dir=outdir.parent))
+            convert(DFN_DIR, tmpdir)
+            if outdir.is_dir():
+                stale = outdir.rename(tmpdir.with_name(f"{tmpdir.name}-stale"))
+                rmtree(stale)
+            tmpdir.rename(outdir)
+        return dfn_stems(outdir, ".toml")
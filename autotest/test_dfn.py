@@ -1,39 +1,31 @@
-from pathlib import Path
-
 import pytest
 
+from autotest.dfn_helpers import DFN_DIR, convert_test_dfns, dfn_stems, fetch_test_dfns
 from modflow_devtools.dfn import Dfn, get_dfns
 from modflow_devtools.dfn2toml import convert
 from modflow_devtools.markers import requires_pkg
 
-PROJ_ROOT = Path(__file__).parents[1]
-DFN_DIR = PROJ_ROOT / "autotest" / "temp" / "dfn"
 TOML_DIR = DFN_DIR / "toml"
 VERSIONS = {1: DFN_DIR, 2: TOML_DIR}
-MF6_OWNER = "MODFLOW-ORG"
-MF6_REPO = "modflow6"
-MF6_REF = "develop"
 
 
 def pytest_generate_tests(metafunc):
+    if "dfn_name" not in metafunc.fixturenames and "toml_name" not in metafunc.fixturenames:
+        return
+
+    # pinned to modflow6@develop, fetched at collection time
+    fetch_test_dfns(fetch=get_dfns)
+
     if "dfn_name" in metafunc.fixturenames:
-        if not any(DFN_DIR.glob("*.dfn")):
-            get_dfns(MF6_OWNER, MF6_REPO, MF6_REF, DFN_DIR, verbose=True)
-        dfn_names = [
-            dfn.stem for dfn in DFN_DIR.glob("*.dfn") if dfn.stem not in ["common", "flopy"]
-        ]
+        dfn_names = [stem for stem in dfn_stems(DFN_DIR) if stem not in ["common", "flopy"]]
         metafunc.parametrize("dfn_name", dfn_names, ids=dfn_names)
 
     if "toml_name" in metafunc.fixturenames:
         # Only convert if TOML files don't exist yet (avoid repeated conversions)
-        dfn_paths = [p for p in DFN_DIR.glob("*.dfn") if p.stem not in ["common", "flopy"]]
-        if not TOML_DIR.exists() or not all(
-            (TOML_DIR / f"{dfn.stem}.toml").is_file() for dfn in dfn_paths
-        ):
-            convert(DFN_DIR, TOML_DIR)
+        dfn_names = [stem for stem in dfn_stems(DFN_DIR) if stem not in ["common", "flopy"]]
+        toml_names = convert_test_dfns(convert, TOML_DIR)
         # Verify all expected TOML files were created
-        assert all((TOML_DIR / f"{dfn.stem}.toml").is_file() for dfn in dfn_paths)
-        toml_names = [toml.stem for toml in TOML_DIR.glob("*.toml")]
+        assert set(toml_names).issuperset(dfn_names)
         metafunc.parametrize("toml_name", toml_names, ids=toml_names)
 
 
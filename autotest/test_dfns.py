@@ -1,96 +1,95 @@
 from dataclasses import asdict
-from pathlib import Path
+from io import BytesIO
 
 import pytest
 from packaging.version import Version
 
+from autotest.dfn_helpers import DFN_DIR, convert_test_dfns, dfn_stems, fetch_test_dfns
 from modflow_devtools.dfns import Dfn, _load_common, load, load_flat
 from modflow_devtools.dfns.dfn2toml import convert, is_valid
-from modflow_devtools.dfns.fetch import fetch_dfns
 from modflow_devtools.dfns.schema.v1 import FieldV1
 from modflow_devtools.dfns.schema.v2 import FieldV2
 from modflow_devtools.markers import requires_pkg
 
-PROJ_ROOT = Path(__file__).parents[1]
-DFN_DIR = PROJ_ROOT / "autotest" / "temp" / "dfns"
-TOML_DIR = DFN_DIR / "toml"
-SPEC_DIRS = {1: DFN_DIR, 2: TOML_DIR}
-MF6_OWNER = "MODFLOW-ORG"
-MF6_REPO = "modflow6"
-MF6_REF = "develop"
+TOML_DIR = DFN_DIR.with_name("dfn-toml")
 EMPTY_DFNS = {"exg-gwfgwe", "exg-gwfgwt", "exg-gwfprt", "sln-ems"}
 
 
 def pytest_generate_tests(metafunc):
+    if "dfn_name" not in metafunc.fixturenames and "toml_name" not in metafunc.fixturenames:
+        return
+
+    # pinned to modflow6@develop, fetched at collection time
+    fetch_test_dfns()
+
+    dfn_names = [stem for stem in dfn_stems(DFN_DIR) if stem not in ["common", "flopy"]]
+
     if "dfn_name" in metafunc.fixturenames:
-        if not any(DFN_DIR.glob("*.dfn")):
-            fetch_dfns(MF6_OWNER, MF6_REPO, MF6_REF, DFN_DIR, verbose=True)
-        dfn_names = [
-            dfn.stem for dfn in DFN_DIR.glob("*.dfn") if dfn.stem not in ["common", "flopy"]
-        ]
         metafunc.parametrize("dfn_name", dfn_names, ids=dfn_names)
 
     if "toml_name" in metafunc.fixturenames:
-        # Only convert if TOML files don't exist yet (avoid repeated conversions)
-        dfn_paths = [p for p in DFN_DIR.glob("*.dfn") if p.stem not in ["common", "flopy"]]
-        if not TOML_DIR.exists() or not all(
-            (TOML_DIR / f"{dfn.stem}.toml").is_file() for dfn in dfn_paths
-        ):
-            convert(DFN_DIR, TOML_DIR)
+        toml_names = convert_test_dfns(convert, TOML_DIR)
         # Verify all expected TOML files were created
-        assert all((TOML_DIR / f"{dfn.stem}.toml").is_file() for dfn in dfn_paths)
-        toml_names = [toml.stem for toml in TOML_DIR.glob("*.toml")]
+        assert set(dfn_names) <= set(toml_names)
         metafunc.parametrize("toml_name", toml_names, ids=toml_names)
 
 
+@pytest.fixture(scope="session")
+def converted_toml_dir():
+    """DFNs converted to TOML, shared by the v2 tests."""
+    fetch_test_dfns()
+    convert_test_dfns(convert, TOML_DIR)
+    return TOML_DIR
+
+
+@pytest.fixture(scope="session")
+def common_spec():
+    fetch_test_dfns()
+    with (DFN_DIR / "common.dfn").open() as common_file:
+        return _load_common(common_file)
+
+
 @requires_pkg("boltons")
-def test_load_v1(dfn_name):
-    with (
-        (DFN_DIR / "common.dfn").open() as common_file,
-        (DFN_DIR / f"{dfn_name}.dfn").open() as dfn_file,
-    ):
-        common = _load_common(common_file)
-        dfn = load(dfn_file, name=dfn_name, format="dfn", common=common)
+def test_load_v1(dfn_name, common_spec):
+    with (DFN_DIR / f"{dfn_name}.dfn").open() as dfn_file:
+        dfn = load(dfn_file, name=dfn_name, format="dfn", common=common_spec)
         assert any(dfn.fields) == (dfn.name not in EMPTY_DFNS)
 
 
 @requires_pkg("boltons")
-def test_load_v2(toml_name):
-    with (TOML_DIR / f"{toml_name}.toml").open(mode="rb") as toml_file:
-        dfn = load(toml_file, name=toml_name, format="toml")
-        assert any(dfn.fields) == (dfn.name not in EMPTY_DFNS)
+def test_load_v2(toml_name, converted_toml_dir):
+    data = (converted_toml_dir / f"{toml_name}.toml").read_bytes()
+    dfn = load(BytesIO(data), name=toml_name, format="toml")
+    assert any(dfn.fields) == (dfn.name not in EMPTY_DFNS)
 
 
 @requires_pkg("boltons")
-@pytest.mark.parametrize("schema_version", list(SPEC_DIRS.keys()))
-def test_load_all(schema_version):
-    dfns = load_flat(path=SPEC_DIRS[schema_version])
+@pytest.mark.parametrize("schema_version", [1, 2])
+def test_load_all(schema_version, converted_toml_dir):
+    spec_dirs = {1: DFN_DIR, 2: converted_toml_dir}
+    dfns = load_flat(path=spec_dirs[schema_version])
     for dfn in dfns.values():
         assert any(dfn.fields) == (dfn.name not in EMPTY_DFNS)
 
 
 @requires_pkg("boltons", "tomli")
-def test_convert(function_tmpdir):
+def test_convert(converted_toml_dir):
     import tomli
 
-    convert(DFN_DIR, function_tmpdir)
-
-    assert (function_tmpdir / "sim-nam.toml").exists()
-    assert (function_tmpdir / "gwf-nam.toml").exists()
+    assert (converted_toml_dir / "sim-nam.toml").exists()
+    assert (converted_toml_dir / "gwf-nam.toml").exists()
 
-    with (function_tmpdir / "sim-nam.toml").open("rb") as f:
-        sim_data = tomli.load(f)
+    sim_data = tomli.loads((converted_toml_dir / "sim-nam.toml").read_text())
     assert sim_data["name"] == "sim-nam"
     assert sim_data["schema_version"] == "2"
     assert "parent" not in sim_data
 
-    with (function_tmpdir / "gwf-nam.toml").open("rb") as f:
-        gwf_data = tomli.load(f)
+    gwf_data = tomli.loads((converted_toml_dir / "gwf-nam.toml").read_text())
     assert gwf_data["name"] == "gwf-nam"
     assert gwf_data["parent"] == "sim-nam"
     assert gwf_data["schema_version"] == "2"
 
-    dfns = load_flat(function_tmpdir)
+    dfns = load_flat(converted_toml_dir)
     roots = []
     for dfn in dfns.values():
         if dfn.parent:
@@ -7,69 +7,34 @@ Tests can be configured via environment variables (loaded from .env file).
 from __future__ import annotations
 
 import os
-from pathlib import Path
-from unittest.mock import patch
+import time
+from urllib.error import URLError
 
 import pytest
 from flaky import flaky
 from packaging.version import Version
 
-from modflow_devtools.dfns.fetch import fetch_dfns
 from modflow_devtools.markers import requires_pkg
 
-PROJ_ROOT = Path(__file__).parents[1]
-DFN_DIR = PROJ_ROOT / "autotest" / "temp" / "dfn"
-
 # Test configuration (loaded from .env file via pytest-dotenv plugin)
-TEST_DFN_REPO = os.getenv("TEST_DFNS_REPO", "MODFLOW-ORG/modflow6")
-TEST_DFN_REF = os.getenv("TEST_DFNS_REF", "develop")
-TEST_DFN_SOURCE = os.getenv("TEST_DFNS_SOURCE", "modflow6")
-
-# For fetching DFN files directly (legacy tests)
-MF6_OWNER = TEST_DFN_REPO.split("/")[0]
-MF6_REPO = TEST_DFN_REPO.split("/")[1]
-MF6_REF = TEST_DFN_REF
-
-# Path to cloned MF6 repository for autodiscovery (set by CI or local testing)
-# If set, use this instead of fetching individual DFN files
-TEST_DFN_PATH = os.getenv("TEST_DFN_PATH")
-
-
-@pytest.fixture(scope="module")
-def dfn_dir():
-    """
-    Provide path to DFN files for testing.
-
-    Priority:
-    1. If TEST_DFN_PATH is set, use the DFN directory from a cloned MF6 repo (autodiscovery)
-    2. Otherwise, fetch individual DFN files to temp directory (legacy behavior)
-
-    The autodiscovery approach is preferred in CI to avoid needing registry files.
-    """
-    # If TEST_DFN_PATH is set, use it (points to cloned MF6 DFN directory)
-    if TEST_DFN_PATH:
-        dfn_path = Path(TEST_DFN_PATH).expanduser().resolve()
-        if not dfn_path.exists():
-            raise ValueError(f"TEST_DFN_PATH={TEST_DFN_PATH} does not exist")
-        if not any(dfn_path.glob("*.dfn")):
-            raise ValueError(f"No DFN files found in TEST_DFN_PATH={TEST_DFN_PATH}")
-        return dfn_path
-
-    # Fall back to fetching individual DFN files (legacy behavior for local development)
-    if not any(DFN_DIR.glob("*.dfn")):
-        fetch_dfns(MF6_OWNER, MF6_REPO, MF6_REF, DFN_DIR, verbose=True)
-    return DFN_DIR
+_TEST_DEFAULTS = {
+    "TEST_DFNS_REPO": "MODFLOW-ORG/modflow6",
+    "TEST_DFNS_REF": "develop",
+    "TEST_DFNS_SOURCE": "modflow6",
+}
+_ENV = {k: os.environ.get(k, v) for k, v in _TEST_DEFAULTS.items()}
+TEST_DFN_REPO = _ENV["TEST_DFNS_REPO"]
+TEST_DFN_REF = _ENV["TEST_DFNS_REF"]
+TEST_DFN_SOURCE = _ENV["TEST_DFNS_SOURCE"]
 
 
 @requires_pkg("boltons")
 class TestDfnSpec:
     """Tests for the DfnSpec class."""
 
-    def test_load_from_directory(self, dfn_dir):
+    def test_load_from_directory(self, loaded_spec):
         """Test loading a DfnSpec from a directory of DFN files."""
-        from modflow_devtools.dfns import DfnSpec
-
-        spec = DfnSpec.load(dfn_dir)
+        spec = loaded_spec
 
         # Should have loaded and mapped to v2
         assert spec.schema_version == Version("2")
@@ -84,20 +49,15 @@ class TestDfnSpec:
 
         assert spec.schema_version == Version("2")
 
-    def test_mapping_protocol(self, dfn_dir):
+    def test_mapping_protocol(self, loaded_spec):
         """Test that DfnSpec implements the Mapping protocol."""
-        from modflow_devtools.dfns import DfnSpec
-
-        spec = DfnSpec.load(dfn_dir)
+        spec = loaded_spec
 
-        # Test __len__
-        assert len(spec) > 100  # Should have many components
-
-        # Test __iter__
-        names = list(spec)
-        assert "sim-nam" in names
-        assert "gwf-nam" in names
-        assert "gwf-chd" in names
+        # Test __iter__ and __len__
+        names = set(spec)
+        assert len(spec) == len(names) > 100  # Should have many components
+        assert {"sim-nam", "gwf-nam", "gwf-chd", "gwf-wel"} <= names
+        assert "nonexistent" not in names
 
         # Test __getitem__
         gwf_chd = spec["gwf-chd"]
@@ -109,24 +69,20 @@ class TestDfnSpec:
         assert "nonexistent" not in spec
 
         # Test keys(), values(), items()
-        assert "gwf-wel" in spec.keys()
-        assert any(d.name == "gwf-wel" for d in spec.values())
-        assert any(n == "gwf-wel" for n, d in spec.items())
+        assert spec.keys() == names
+        assert spec["gwf-wel"] in spec.values()
+        assert ("gwf-wel", spec["gwf-wel"]) in spec.items()
 
-    def test_getitem_raises_keyerror(self, dfn_dir):
+    def test_getitem_raises_keyerror(self, loaded_spec):
         """Test that __getitem__ raises KeyError for missing components."""
-        from modflow_devtools.dfns import DfnSpec
-
-        spec = DfnSpec.load(dfn_dir)
+        spec = loaded_spec
 
         with pytest.raises(KeyError, match="nonexistent"):
             _ = spec["nonexistent"]
 
-    def test_hierarchical_access(self, dfn_dir):
+    def test_hierarchical_access(self, loaded_spec):
         """Test accessing components through the hierarchical tree."""
-        from modflow_devtools.dfns import DfnSpec
-
-        spec = DfnSpec.load(dfn_dir)
+        spec = loaded_spec
 
         # Root should be sim-nam
         assert spec.root.name == "sim-nam"
@@ -179,19 +135,16 @@ class TestBootstrapConfig:
         assert config.registry_path == "custom/registry.toml"
         assert config.refs == ["main", "v1.0"]
 
-    def test_bootstrap_config_load(self, tmp_path):
-        """Test loading BootstrapConfig from TOML file."""
+    def test_bootstrap_config_load(self):
+        """Test loading BootstrapConfig from a TOML string."""
         from modflow_devtools.dfns.registry import BootstrapConfig
 
-        config_file = tmp_path / "dfns.toml"
-        config_file.write_text("""
+        config = BootstrapConfig.loads("""
 [sources.test]
 repo = "test/repo"
 refs = ["main"]
 """)
 
-        config = BootstrapConfig.load(config_file)
-
         assert "test" in config.sources
         assert config.sources["test"].repo == "test/repo"
         assert config.sources["test"].refs == ["main"]
@@ -245,12 +198,11 @@ refs = ["main"]
 class TestRegistryMeta:
     """Tests for registry metadata schemas."""
 
-    def test_dfn_registry_meta_load(self, tmp_path):
-        """Test loading DfnRegistryMeta from TOML file."""
+    def test_dfn_registry_meta_load(self):
+        """Test loading DfnRegistryMeta from a TOML string."""
         from modflow_devtools.dfns.registry import DfnRegistryMeta
 
-        registry_file = tmp_path / "dfns.toml"
-        registry_file.write_text("""
+        meta = DfnRegistryMeta.loads("""
 schema_version = "1.0"
 
 [metadata]
@@ -263,8 +215,6 @@ hash = "sha256:abc123"
 hash = "sha256:def456"
 """)
 
-        meta = DfnRegistryMeta.load(registry_file)
-
         assert meta.schema_version == "1.0"
         assert meta.ref == "6.6.0"
         assert len(meta.files) == 2
@@ -290,8 +240,7 @@ hash = "sha256:def456"
 
         assert output_path.exists()
 
-        with output_path.open("rb") as f:
-            data = tomli.load(f)
+        data = tomli.loads(output_path.read_text())
 
         assert data["schema_version"] == "1.0"
         assert data["metadata"]["ref"] == "test-ref"
@@ -302,6 +251,13 @@ hash = "sha256:def456"
 class TestLocalDfnRegistry:
     """Tests for LocalDfnRegistry class."""
 
+    @pytest.fixture(scope="class")
+    def local_registry(self, dfn_dir):
+        """Fixture providing one registry (and one parsed spec) for all tests."""
+        from modflow_devtools.dfns import LocalDfnRegistry
+
+        return LocalDfnRegistry(path=dfn_dir)
+
     def test_init(self, dfn_dir):
         """Test LocalDfnRegistry initialization."""
         from modflow_devtools.dfns import LocalDfnRegistry
@@ -312,63 +268,39 @@ class TestLocalDfnRegistry:
         assert registry.ref == "local"
         assert registry.path == dfn_dir.resolve()
 
-    def test_spec_property(self, dfn_dir):
+    def test_spec_property(self, local_registry):
         """Test accessing spec through registry."""
-        from modflow_devtools.dfns import LocalDfnRegistry
-
-        registry = LocalDfnRegistry(path=dfn_dir)
-
-        spec = registry.spec
+        spec = local_registry.spec
 
         assert spec.schema_version == Version("2")
         assert len(spec) > 100
 
-    def test_get_dfn(self, dfn_dir):
+    def test_get_dfn(self, local_registry):
         """Test getting a DFN by name."""
-        from modflow_devtools.dfns import LocalDfnRegistry
-
-        registry = LocalDfnRegistry(path=dfn_dir)
-
-        dfn = registry.get_dfn("gwf-chd")
+        dfn = local_registry.get_dfn("gwf-chd")
 
         assert dfn.name == "gwf-chd"
         assert dfn.parent == "gwf-nam"
 
-    def test_get_dfn_path(self, dfn_dir):
+    def test_get_dfn_path(self, local_registry):
         """Test getting file path for a component."""
-        from modflow_devtools.dfns import LocalDfnRegistry
-
-        registry = LocalDfnRegistry(path=dfn_dir)
-
-        path = registry.get_dfn_path("gwf-chd")
+        path = local_registry.get_dfn_path("gwf-chd")
 
         assert path.exists()
         assert path.name == "gwf-chd.dfn"
 
-    def test_get_dfn_path_not_found(self, dfn_dir):
+    def test_get_dfn_path_not_found(self, local_registry):
         """Test getting path for nonexistent component raises FileNotFoundError."""
-        from modflow_devtools.dfns import LocalDfnRegistry
-
-        registry = LocalDfnRegistry(path=dfn_dir)
-
         with pytest.raises(FileNotFoundError, match="nonexistent"):
-            registry.get_dfn_path("nonexistent")
+            local_registry.get_dfn_path("nonexistent")
 
-    def test_schema_version_property(self, dfn_dir):
+    def test_schema_version_property(self, local_registry):
         """Test schema_version property."""
-        from modflow_devtools.dfns import LocalDfnRegistry
+        assert local_registry.schema_version == Version("2")
 
-        registry = LocalDfnRegistry(path=dfn_dir)
-
-        assert registry.schema_version == Version("2")
-
-    def test_components_property(self, dfn_dir):
+    def test_components_property(self, local_registry):
         """Test components property returns flat dict."""
-        from modflow_devtools.dfns import LocalDfnRegistry
-
-        registry = LocalDfnRegistry(path=dfn_dir)
-
-        components = registry.components
+        components = local_registry.components
 
         assert isinstance(components, dict)
         assert "gwf-chd" in components
@@ -419,9 +351,10 @@ class TestMakeRegistry:
 
         hash_value = compute_file_hash(test_file)
 
-        assert hash_value.startswith("sha256:")
         # Known hash for "hello world"
-        assert "b94d27b9934d3e08a52e52d7da7dabfac484efe37a5380ee9088f7ace2efcde9" in hash_value
+        assert hash_value == (
+            "sha256:b94d27b9934d3e08a52e52d7da7dabfac484efe37a5380ee9088f7ace2efcde9"
+        )
 
     def test_scan_dfn_directory(self, dfn_dir):
         """Test scanning a DFN directory."""
@@ -516,17 +449,20 @@ class TestCLI:
         result = main(["info"])
         assert result == 0
 
-    def test_clean_command_no_cache(self, tmp_path):
+    def test_clean_command_no_cache(self, tmp_path, monkeypatch):
         """Test clean command when cache doesn't exist."""
         from modflow_devtools.dfns.__main__ import main
 
         # Patch get_cache_dir to return nonexistent directory
-        with patch("modflow_devtools.dfns.__main__.get_cache_dir") as mock_cache_dir:
-            mock_cache_dir.return_value = tmp_path / "nonexistent"
-            result = main(["clean"])
+        monkeypatch.setattr(
+            "modflow_devtools.dfns.__main__.get_cache_dir",
+            lambda *_, **__: tmp_path / "nonexistent",
+        )
+        result = main(["clean"])
 
         assert result == 0
 
+    @pytest.mark.network
     def test_sync_command_no_registry(self):
         """Test sync command when registry doesn't exist (expected to fail)."""
         from modflow_devtools.dfns.__main__ import main
@@ -540,6 +476,8 @@ class TestCLI:
 class TestRemoteDfnRegistry:
     """Tests for RemoteDfnRegistry with mocked network calls."""
 
+    pytestmark = pytest.mark.network
+
     def test_init(self):
         """Test RemoteDfnRegistry initialization."""
         from modflow_devtools.dfns import RemoteDfnRegistry
@@ -654,10 +592,10 @@ class TestRemoteDfnRegistry:
         # (e.g., generated from develop branch but accessed on registry branch)
         assert meta.ref is not None
 
-    @flaky(max_runs=3, min_passes=1)
-    def test_sync_files(self):
-        """Test syncing DFN files from the test repository."""
-        from modflow_devtools.dfns.registry import RemoteDfnRegistry
+    @pytest.fixture(scope="class")
+    def synced_remote_registry(self):
+        """Fixture that syncs the test repository's registry once for all tests."""
+        from modflow_devtools.dfns.registry import DfnRegistryDiscoveryError, RemoteDfnRegistry
 
         registry = RemoteDfnRegistry(
             source=TEST_DFN_SOURCE,
@@ -665,74 +603,49 @@ class TestRemoteDfnRegistry:
             repo=TEST_DFN_REPO,
         )
 
-        # Sync should succeed (fetches registry and sets up pooch)
+        # Sync should succeed (fetches registry and sets up pooch). Flaky
+        # reruns tests, not fixtures, so retry network errors here.
+        for run in range(2):
+            try:
+                registry.sync(force=True)
+                return registry
+            except (DfnRegistryDiscoveryError, URLError, TimeoutError):
+                time.sleep(2**run)
         registry.sync(force=True)
+        return registry
 
+    def test_sync_files(self, synced_remote_registry):
+        """Test syncing DFN files from the test repository."""
         # Should be able to fetch a DFN file
-        path = registry.get_dfn_path("gwf-chd")
+        path = synced_remote_registry.get_dfn_path("gwf-chd")
         assert path.exists()
 
-    @flaky(max_runs=3, min_passes=1)
-    def test_get_dfn(self):
+    def test_get_dfn(self, synced_remote_registry):
         """Test getting a DFN from the test repository."""
         from modflow_devtools.dfns import Dfn
-        from modflow_devtools.dfns.registry import RemoteDfnRegistry
-
-        registry = RemoteDfnRegistry(
-            source=TEST_DFN_SOURCE,
-            ref=TEST_DFN_REF,
-            repo=TEST_DFN_REPO,
-        )
-
-        # Ensure synced
-        registry.sync()
 
-        dfn = registry.get_dfn("gwf-chd")
+        dfn = synced_remote_registry.get_dfn("gwf-chd")
 
         assert isinstance(dfn, Dfn)
         assert dfn.name == "gwf-chd"
 
-    @flaky(max_runs=3, min_passes=1)
-    def test_get_spec(self):
+    def test_get_spec(self, synced_remote_registry):
         """Test getting the full spec from the test repository."""
         from modflow_devtools.dfns import DfnSpec
-        from modflow_devtools.dfns.registry import RemoteDfnRegistry
 
-        registry = RemoteDfnRegistry(
-            source=TEST_DFN_SOURCE,
-            ref=TEST_DFN_REF,
-            repo=TEST_DFN_REPO,
-        )
-
-        # Ensure synced
-        registry.sync()
-
-        spec = registry.spec
+        spec = synced_remote_registry.spec
 
         assert isinstance(spec, DfnSpec)
         assert "gwf-chd" in spec
         assert "sim-nam" in spec
 
-    @flaky(max_runs=3, min_passes=1)
-    def test_list_components(self):
+    def test_list_components(self, synced_remote_registry):
         """Test listing available components from the test repository."""
-        from modflow_devtools.dfns.registry import RemoteDfnRegistry
-
-        registry = RemoteDfnRegistry(
-            source=TEST_DFN_SOURCE,
-            ref=TEST_DFN_REF,
-            repo=TEST_DFN_REPO,
-        )
-
-        # Ensure synced
-        registry.sync()
-
         # Use spec.keys() to list components
-        components = list(registry.spec.keys())
+        components = set(synced_remote_registry.spec.keys())
 
         assert len(components) > 100
-        assert "gwf-chd" in components
-        assert "sim-nam" in components
+        assert {"gwf-chd", "sim-nam"} <= components
 
 
 @requires_pkg("boltons", "pydantic")
@@ -744,11 +657,10 @@ class TestModuleFunctions:
         from modflow_devtools.dfns import LocalDfnRegistry
 
         registry = LocalDfnRegistry(path=dfn_dir)
-        components = list(registry.spec.keys())
+        components = set(registry.spec.keys())
 
         assert len(components) > 100
-        assert "gwf-chd" in components
-        assert "sim-nam" in components
+        assert {"gwf-chd", "sim-nam"} <= components
 
     def test_get_sync_status(self):
         """Test get_sync_status function."""
@@ -1,61 +1,60 @@
-import inspect
-import platform
+import os
+import uuid
 from pathlib import Path
 
 import pytest
-from _pytest.config import ExitCode
 
-system = platform.system()
-proj_root = Path(__file__).parents[1]
-module_name = inspect.getmodulename(__file__)
-assert module_name is not None  # appease mypy
-module_path = Path(module_name)
+_MODULE_STEM = Path(__file__).stem
+
+_OK, _FAILED = int(pytest.ExitCode.OK), int(pytest.ExitCode.TESTS_FAILED)
+
+# common leading arguments for meta-test sessions
+_BASE_ARGS = (__file__, "-v", "-s")
+
+_CLASS_PAYLOAD = b"hello, class-scoped tmpdir"
+
+
+def _run_inner(args, plugins=None) -> int:
+    """
+    Run a nested pytest session for a meta-test, without the cache provider
+    (nothing reads the nested session's cache).
+    """
+    return pytest.main([*args, "-p", "no:cacheprovider"], plugins=plugins)
 
 
 # test temporary directory fixtures
 
 
-def test_tmpdirs(function_tmpdir, module_tmpdir):
+def test_tmpdirs(function_tmpdir, module_tmpdir, request):
     # function-scoped temporary directory
-    assert isinstance(function_tmpdir, Path)
     assert function_tmpdir.is_dir()
-    assert inspect.currentframe().f_code.co_name in function_tmpdir.stem
+    assert request.node.originalname in function_tmpdir.stem
 
     # module-scoped temp dir (accessible to other tests in the script)
     assert module_tmpdir.is_dir()
     assert "test" in module_tmpdir.stem
 
 
-def test_function_scoped_tmpdir(function_tmpdir):
-    assert isinstance(function_tmpdir, Path)
+def test_function_scoped_tmpdir(function_tmpdir, request):
     assert function_tmpdir.is_dir()
-    assert inspect.currentframe().f_code.co_name in function_tmpdir.stem
+    assert request.node.originalname in function_tmpdir.stem
+
+
+_TBL1 = str.maketrans({"/": "_", "\\": "_", ":": "_", "[": "", "]": ""})
+_TBL2 = str.maketrans({"/": "_", ":": "_", "[": "", "]": ""})
 
 
 @pytest.mark.parametrize("name", ["noslash", "forward/slash", "back\\slash"])
-def test_function_scoped_tmpdir_slash_in_name(function_tmpdir, name):
-    assert isinstance(function_tmpdir, Path)
+def test_function_scoped_tmpdir_slash_in_name(function_tmpdir, name, request):
     assert function_tmpdir.is_dir()
 
     # node name might have slashes if test function is parametrized
     # (e.g., test_function_scoped_tmpdir_slash_in_name[a/slash])
-    replaced1 = (
-        name.replace("/", "_")
-        .replace("\\", "_")
-        .replace(":", "_")
-        .replace("[", "")
-        .replace("]", "")
-    )
-    replaced2 = (
-        name.replace("/", "_")
-        .replace("\\", "__")
-        .replace(":", "_")
-        .replace("[", "")
-        .replace("]", "")
-    )
+    replaced1 = name.translate(_TBL1)
+    replaced2 = name.translate(_TBL2).replace("\\", "__")
     assert (
-        f"{inspect.currentframe().f_code.co_name}_{replaced1}_" in function_tmpdir.stem
-        or f"{inspect.currentframe().f_code.co_name}_{replaced2}_" in function_tmpdir.stem
+        f"{request.node.originalname}_{replaced1}_" in function_tmpdir.stem
+        or f"{request.node.originalname}_{replaced2}_" in function_tmpdir.stem
     )
 
 
@@ -65,153 +64,183 @@ class TestClassScopedTmpdir:
     @pytest.fixture(autouse=True)
     def setup(self, class_tmpdir):
         file = class_tmpdir / self.fname
-        file.write_text("hello, class-scoped tmpdir")
+        file.write_bytes(_CLASS_PAYLOAD)
 
     def test_class_scoped_tmpdir(self, class_tmpdir):
-        assert isinstance(class_tmpdir, Path)
         assert class_tmpdir.is_dir()
         assert self.__class__.__name__ in class_tmpdir.stem
         assert (class_tmpdir / self.fname).is_file()
 
 
 def test_module_scoped_tmpdir(module_tmpdir):
-    assert isinstance(module_tmpdir, Path)
     assert module_tmpdir.is_dir()
-    assert module_path.stem in module_tmpdir.name
+    assert _MODULE_STEM in module_tmpdir.name
 
 
 def test_session_scoped_tmpdir(session_tmpdir):
-    assert isinstance(session_tmpdir, Path)
     assert session_tmpdir.is_dir()
 
 
 # test CLI arguments --keep (-K) and --keep-failed for temp dir fixtures
 
 test_keep_fname = "hello.txt"
+_FN_PAYLOAD = b"hello, function-scoped tmpdir"
+_MOD_PAYLOAD = b"hello, module-scoped tmpdir"
+_SESS_PAYLOAD = b"hello, session-scoped tmpdir"
+
+
+@pytest.fixture(scope="session")
+def keep_root(tmp_path_factory) -> Path:
+    """Shared parent for meta-test --keep/--keep-failed destinations."""
+    return tmp_path_factory.mktemp("keep_root")
+
+
+def _latest_numbered(root: Path, prefix: str) -> Path | None:
+    """
+    Find the subdirectory of `root` named `prefix` plus the highest numeric
+    suffix, as made by `tmp_path_factory.mktemp`, or None if there is none.
+    """
+    latest, latest_n = None, -1
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                suffix = entry.name.removeprefix(prefix)
+                if suffix != entry.name and suffix.isdigit() and int(suffix) > latest_n:
+                    latest, latest_n = entry.path, int(suffix)
+    except FileNotFoundError:
+        return None
+    return None if latest is None else Path(latest)
+
+
+def _write_keep_file(dir_: Path, content: bytes):
+    fd = os.open(dir_ / test_keep_fname, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, content)
+    finally:
+        os.close(fd)
 
 
 @pytest.mark.meta("test_keep")
 def test_keep_function_scoped_tmpdir_inner(function_tmpdir):
-    file = function_tmpdir / test_keep_fname
-    file.write_text("hello, function-scoped tmpdir")
+    _write_keep_file(function_tmpdir, _FN_PAYLOAD)
 
 
 @pytest.mark.meta("test_keep")
 class TestKeepClassScopedTmpdirInner:
     def test_keep_class_scoped_tmpdir_inner(self, class_tmpdir):
-        file = class_tmpdir / test_keep_fname
-        file.write_text("hello, class-scoped tmpdir")
+        _write_keep_file(class_tmpdir, _CLASS_PAYLOAD)
 
 
 @pytest.mark.meta("test_keep")
 def test_keep_module_scoped_tmpdir_inner(module_tmpdir):
-    file = module_tmpdir / test_keep_fname
-    file.write_text("hello, module-scoped tmpdir")
+    _write_keep_file(module_tmpdir, _MOD_PAYLOAD)
 
 
 @pytest.mark.meta("test_keep")
 def test_keep_session_scoped_tmpdir_inner(session_tmpdir):
-    file = session_tmpdir / test_keep_fname
-    file.write_text("hello, session-scoped tmpdir")
-
-
-@pytest.mark.parametrize("arg", ["--keep", "-K"])
-def test_keep_function_scoped_tmpdir(function_tmpdir, arg):
-    inner_fn = test_keep_function_scoped_tmpdir_inner.__name__
-    file_path = function_tmpdir / f"{inner_fn}0" / test_keep_fname
+    _write_keep_file(session_tmpdir, _SESS_PAYLOAD)
+
+
+# inner test names keyed by the scope of the temp dir they keep
+_KEEP_CASES = {
+    "function": test_keep_function_scoped_tmpdir_inner.__name__,
+    "class": TestKeepClassScopedTmpdirInner.test_keep_class_scoped_tmpdir_inner.__name__,
+    "module": test_keep_module_scoped_tmpdir_inner.__name__,
+    "session": test_keep_session_scoped_tmpdir_inner.__name__,
+}
+
+
+@pytest.fixture(scope="session")
+def keep_scenarios(request, keep_root) -> dict[str, list[float | None]]:
+    """
+    Run all the inner `test_keep` meta-tests in one session, twice, and record
+    the modification time of the file each leaves in the kept directory after
+    each run (None if missing), keyed by temp dir scope. Files kept by the
+    first run are back-dated a second before the second run.
+    """
+    keep_path = keep_root / "keep_all"
+    kept_prefixes = {
+        "function": _KEEP_CASES["function"],
+        "class": TestKeepClassScopedTmpdirInner.__name__,
+        "module": f"{Path(__file__).parent.name}.{_MODULE_STEM}",
+        "session": request.config.rootpath.name,
+    }
     args = [
-        __file__,
-        "-v",
-        "-s",
+        *_BASE_ARGS,
         "-k",
-        inner_fn,
+        " or ".join(_KEEP_CASES.values()),
         "-M",
         "test_keep",
-        arg,
-        function_tmpdir,
-    ]
-    assert pytest.main(args) == ExitCode.OK
-    assert file_path.is_file()
-    first_modified = file_path.stat().st_mtime
-
-    assert pytest.main(args) == ExitCode.OK
-    assert file_path.is_file()
-    second_modified = file_path.stat().st_mtime
-
-    # make sure contents were overwritten
-    assert first_modified < second_modified
-
-
-@pytest.mark.parametrize("arg", ["--keep", "-K"])
-def test_keep_class_scoped_tmpdir(tmp_path, arg):
-    args = [
-        __file__,
-        "-v",
-        "-s",
-        "-k",
-        TestKeepClassScopedTmpdirInner.test_keep_class_scoped_tmpdir_inner.__name__,
-        "-M",
-        "test_keep",
-        arg,
-        tmp_path,
-    ]
-    assert pytest.main(args) == ExitCode.OK
-    assert (tmp_path / f"{TestKeepClassScopedTmpdirInner.__name__}0" / test_keep_fname).is_file()
-
-
-@pytest.mark.parametrize("arg", ["--keep", "-K"])
-def test_keep_module_scoped_tmpdir(tmp_path, arg):
-    args = [
-        __file__,
-        "-v",
-        "-s",
-        "-k",
-        test_keep_module_scoped_tmpdir_inner.__name__,
-        "-M",
-        "test_keep",
-        arg,
-        tmp_path,
-    ]
-    assert pytest.main(args) == ExitCode.OK
-    this_path = Path(__file__)
-    keep_path = tmp_path / f"{this_path.parent.name}.{this_path.stem}0"
-    assert test_keep_fname in [f.name for f in keep_path.glob("*")]
-
-
-@pytest.mark.parametrize("arg", ["--keep", "-K"])
-def test_keep_session_scoped_tmpdir(tmp_path, arg, request):
-    args = [
-        __file__,
-        "-v",
-        "-s",
-        "-k",
-        test_keep_session_scoped_tmpdir_inner.__name__,
-        "-M",
-        "test_keep",
-        arg,
-        tmp_path,
+        "--keep",
+        keep_path,
     ]
-    assert pytest.main(args) == ExitCode.OK
-    assert (tmp_path / f"{request.config.rootpath.name}0" / test_keep_fname).is_file()
+    mtimes: dict[str, list[float | None]] = {scope: [] for scope in kept_prefixes}
+    for i in range(2):
+        assert _run_inner(args) == _OK
+        for scope, prefix in kept_prefixes.items():
+            kept_dir = _latest_numbered(keep_path, prefix)
+            if kept_dir is None:
+                mtimes[scope].append(None)
+                continue
+            file_path = kept_dir / test_keep_fname
+            try:
+                modified = file_path.stat().st_mtime
+            except FileNotFoundError:
+                mtimes[scope].append(None)
+                continue
+            if not i:
+                # back-date the first run's file so the rewrite shows
+                # regardless of the filesystem's timestamp resolution
+                modified -= 1
+                os.utime(file_path, (modified, modified))
+            mtimes[scope].append(modified)
+    return mtimes
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("scope", list(_KEEP_CASES))
+def test_keep_scoped_tmpdir(keep_scenarios, scope):
+    first_modified, second_modified = keep_scenarios[scope]
+    assert first_modified is not None
+    assert second_modified is not None
+
+    # make sure function-scoped contents were overwritten
+    if scope == "function":
+        assert first_modified < second_modified
+
+
+@pytest.mark.slow
+def test_keep_short_option(keep_root):
+    # -K is an alias for --keep, so one function-scoped case is enough
+    inner_fn = _KEEP_CASES["function"]
+    keep_path = keep_root / str(uuid.uuid4())
+    args = [*_BASE_ARGS, "-k", inner_fn, "-M", "test_keep", "-K", keep_path]
+    assert _run_inner(args) == _OK
+
+    kept_dir = _latest_numbered(keep_path, inner_fn)
+    assert kept_dir is not None
+    assert (kept_dir / test_keep_fname).read_bytes() == _FN_PAYLOAD
 
 
 @pytest.mark.meta("test_keep_failed")
 def test_keep_failed_function_scoped_tmpdir_inner(function_tmpdir):
-    file = function_tmpdir / test_keep_fname
-    file.write_text("hello, function-scoped tmpdir")
+    _write_keep_file(function_tmpdir, _FN_PAYLOAD)
 
     raise AssertionError("oh no")
 
 
+@pytest.mark.slow
 @pytest.mark.parametrize("keep", [True, False])
-def test_keep_failed_function_scoped_tmpdir(function_tmpdir, keep):
+def test_keep_failed_function_scoped_tmpdir(keep_root, keep):
     inner_fn = test_keep_failed_function_scoped_tmpdir_inner.__name__
-    args = [__file__, "-v", "-s", "-k", inner_fn, "-M", "test_keep_failed"]
+    keep_path = keep_root / str(uuid.uuid4())
+    args = [*_BASE_ARGS, "-k", inner_fn, "-M", "test_keep_failed"]
     if keep:
-        args += ["--keep-failed", function_tmpdir]
-    assert pytest.main(args) == ExitCode.TESTS_FAILED
+        args += ["--keep-failed", keep_path]
+    assert _run_inner(args) == _FAILED
 
-    kept_file = (function_tmpdir / f"{inner_fn}0" / test_keep_fname).is_file()
+    kept_dir = _latest_numbered(keep_path, inner_fn)
+    kept_file = kept_dir is not None and (kept_dir / test_keep_fname).is_file()
     assert kept_file if keep else not kept_file
 
 
@@ -228,25 +257,20 @@ class TestMeta:
         stats = terminalreporter.stats
         assert "failed" not in stats
 
-        passed = [test.head_line for test in stats["passed"]]
+        passed = stats["passed"]
         assert len(passed) == 1
-        assert test_meta_inner.__name__ in passed
+        assert passed[0].head_line == test_meta_inner.__name__
+        assert stats["deselected"]
 
-        deselected = [fn.name for fn in stats["deselected"]]
-        assert len(deselected) > 0
 
+# stateless, so one instance can be registered with any session
+_META_PLUGIN = TestMeta()
 
+
+@pytest.mark.slow
 def test_meta():
-    args = [
-        __file__,
-        "-v",
-        "-s",
-        "-k",
-        test_meta_inner.__name__,
-        "-M",
-        "test_meta",
-    ]
-    assert pytest.main(args, plugins=[TestMeta()]) == ExitCode.OK
+    args = [*_BASE_ARGS, "-k", test_meta_inner.__name__, "-M", "test_meta"]
+    assert _run_inner(args, plugins=[_META_PLUGIN]) == _OK
 
 
 # test tabular data format fixture
@@ -261,23 +285,25 @@ def test_tabular_inner(function_tmpdir, tabular):
     file.write_text(str(tabular))
 
 
+@pytest.mark.slow
 @pytest.mark.parametrize("tabular", ["raw", "recarray", "dataframe"])
 @pytest.mark.parametrize("arg", ["--tabular", "-T"])
-def test_tabular(tabular, arg, function_tmpdir):
+def test_tabular(tabular, arg, keep_root):
     inner_fn = test_tabular_inner.__name__
+    keep_path = keep_root / str(uuid.uuid4())
     args = [
-        __file__,
-        "-v",
-        "-s",
+        *_BASE_ARGS,
         "-k",
         inner_fn,
         arg,
         tabular,
         "--keep",
-        function_tmpdir,
+        keep_path,
         "-M",
         "test_tabular",
     ]
-    assert pytest.main(args) == ExitCode.OK
-    file = next(function_tmpdir.rglob(test_tabular_fname))
+    assert _run_inner(args) == _OK
+    kept_dir = _latest_numbered(keep_path, inner_fn)
+    assert kept_dir is not None
+    file = kept_dir / test_tabular_fname
     assert tabular == file.read_text()
@@ -19,6 +19,8 @@ from typing import TYPE_CHECKING
 from packaging.version import Version
 from pydantic import BaseModel, Field
 
+from modflow_devtools.misc import loads_toml
+
 if TYPE_CHECKING:
     import pooch
 
@@ -78,14 +80,16 @@ class BootstrapConfig(BaseModel):
     @classmethod
     def load(cls, path: str | PathLike) -> BootstrapConfig:
         """Load bootstrap configuration from a TOML file."""
-        import tomli
-
         path = Path(path)
         if not path.exists():
             return cls()
 
-        with path.open("rb") as f:
-            data = tomli.load(f)
+        return cls.loads(path.read_text(encoding="utf-8"))
+
+    @classmethod
+    def loads(cls, s: str) -> BootstrapConfig:
+        """Load bootstrap configuration from a TOML string."""
+        data = loads_toml(s)
 
         # Convert sources dict to SourceConfig instances
         sources = {}
@@ -144,11 +148,12 @@ class DfnRegistryMeta(BaseModel):
     @classmethod
     def load(cls, path: str | PathLike) -> DfnRegistryMeta:
         """Load registry metadata from a TOML file."""
-        import tomli
+        return cls.loads(Path(path).read_text(encoding="utf-8"))
 
-        path = Path(path)
-        with path.open("rb") as f:
-            data = tomli.load(f)
+    @classmethod
+    def loads(cls, s: str) -> DfnRegistryMeta:
+        """Load registry metadata from a TOML string."""
+        data = loads_toml(s)
 
         # Handle nested structure: files section contains filename -> {hash: ...}
         files_data = data.pop("files", {})
@@ -496,27 +501,9 @@ class RemoteDfnRegistry(DfnRegistry):
             ) from e
 
         # Parse and cache
-        import tomli
-
-        data = tomli.loads(content.decode("utf-8"))
-
-        # Build registry meta from parsed data
-        files_data = data.pop("files", {})
-        files = {}
-        for filename, file_info in files_data.items():
-            if isinstance(file_info, dict):
-                files[filename] = DfnRegistryFile(**file_info)
-            elif isinstance(file_info, str):
-                files[filename] = DfnRegistryFile(hash=file_info)
-
-        metadata = data.pop("metadata", {})
-        registry_meta = DfnRegistryMeta(
-            schema_version=data.get("schema_version", "1.0"),
-            generated_at=data.get("generated_at"),
-            devtools_version=data.get("devtools_version"),
-            ref=metadata.get("ref") or data.get("ref") or self.ref,
-            files=files,
-        )
+        registry_meta = DfnRegistryMeta.loads(content.decode("utf-8"))
+        if registry_meta.ref is None:
+            registry_meta.ref = self.ref
 
         # Cache the registry
         cache_path.parent.mkdir(parents=True, exist_ok=True)
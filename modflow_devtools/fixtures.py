@@ -383,9 +383,9 @@ def pytest_generate_tests(metafunc):
 
             return examples
 
-        example_scenarios = get_examples() if repo_path else {}
+        example_scenarios = list(get_examples().items()) if repo_path else []
         metafunc.parametrize(
             key,
-            list(example_scenarios.items()),
-            ids=list(example_scenarios.keys()),
+            example_scenarios,
+            ids=[name for name, _ in example_scenarios],
         )
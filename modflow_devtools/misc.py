@@ -14,10 +14,20 @@ from pathlib import Path, PurePosixPath
 from shutil import which
 from subprocess import run
 from timeit import timeit
+from types import ModuleType
 from typing import Any
 from urllib import request
 from urllib.error import URLError
 
+tomllib: ModuleType | None
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    try:
+        import tomli as tomllib
+    except ModuleNotFoundError:
+        tomllib = None
+
 
 @contextmanager
 def set_dir(path: PathLike, verbose: bool = False):
@@ -577,3 +587,10 @@ def drop_none_or_empty(path, key, value):
     if value is None or (isinstance(value, Iterable) and not any(value)):
         return False
     return True
+
+
+def loads_toml(s: str) -> dict:
+    """Parse a TOML string, with the standard library parser where available."""
+    if tomllib is None:
+        raise ModuleNotFoundError("Parsing TOML on Python < 3.11 requires tomli")
+    return tomllib.loads(s)
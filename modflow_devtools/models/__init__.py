@@ -3,14 +3,13 @@ import os
 import urllib
 from collections.abc import Callable
 from dataclasses import dataclass, field
-from functools import partial
+from functools import cache, partial
 from os import PathLike
 from pathlib import Path
 from shutil import copy
 from typing import ClassVar, Literal
 
 import pooch
-import tomli
 import tomli_w
 from boltons.iterutils import remap
 from filelock import FileLock
@@ -25,7 +24,7 @@ from pydantic import (
 
 import modflow_devtools
 from modflow_devtools.download import fetch_url
-from modflow_devtools.misc import drop_none_or_empty, get_model_paths
+from modflow_devtools.misc import drop_none_or_empty, get_model_paths, loads_toml
 
 _CACHE_ROOT = Path(pooch.os_cache("modflow-devtools"))
 """
@@ -281,16 +280,16 @@ class ModelCache:
             Cached registry if found, None otherwise
         """
         registry_file = self.get_registry_cache_dir(source, ref) / _DEFAULT_REGISTRY_FILE_NAME
-        if not registry_file.exists():
+        try:
+            data = loads_toml(registry_file.read_text(encoding="utf-8"))
+        except FileNotFoundError:
             return None
 
-        with registry_file.open("rb") as f:
-            data = tomli.load(f)
-            # Defensive: filter out any empty file entries that might have been saved
-            # (should not happen with current code, but handles edge cases)
-            if "files" in data:
-                data["files"] = {k: v for k, v in data["files"].items() if v}
-            return ModelRegistry(**data)
+        # Defensive: filter out any empty file entries that might have been saved
+        # (should not happen with current code, but handles edge cases)
+        if "files" in data:
+            data["files"] = {k: v for k, v in data["files"].items() if v}
+        return ModelRegistry(**data)
 
     def has(self, source: str, ref: str) -> bool:
         """
@@ -307,6 +306,12 @@ class ModelCache:
         -------
         bool
             True if registry is cached, False otherwise
+
+        Notes
+        -----
+        This checks the filesystem (a single stat) rather than an in-memory
+        index, since the cache may be shared with other processes, e.g. the
+        CLI or parallel test workers, which can save or clear registries.
         """
         registry_file = self.get_registry_cache_dir(source, ref) / _DEFAULT_REGISTRY_FILE_NAME
         return registry_file.exists()
@@ -400,6 +405,15 @@ _DEFAULT_CACHE = ModelCache(root=_CACHE_ROOT)
 _DEFAULT_CONFIG_PATH = Path(__file__).parent / "models.toml"
 
 
+@cache
+def _load_default_config() -> dict:
+    """
+    Parse the bundled model source config. It ships with the package and is
+    read-only, so it's parsed once per process. Treat the result as read-only.
+    """
+    return loads_toml(_DEFAULT_CONFIG_PATH.read_text(encoding="utf-8"))
+
+
 def get_user_config_path() -> Path:
     """
     Get the path to the user model configuration file.
@@ -524,7 +538,7 @@ class ModelSourceRepo(BaseModel):
         release_url = f"https://github.com/{org}/{repo_name}/releases/download/{ref}/models.toml"
         try:
             registry_data = fetch_url(release_url)
-            registry = ModelRegistry(**tomli.loads(registry_data))
+            registry = ModelRegistry(**loads_toml(registry_data))
             return DiscoveredModelRegistry(
                 registry=registry,
                 mode="release_asset",
@@ -546,7 +560,7 @@ class ModelSourceRepo(BaseModel):
         )
         try:
             registry_data = fetch_url(vc_url)
-            registry = ModelRegistry(**tomli.loads(registry_data))
+            registry = ModelRegistry(**loads_toml(registry_data))
             return DiscoveredModelRegistry(
                 registry=registry,
                 mode="version_controlled",
@@ -695,33 +709,29 @@ class ModelSourceConfig(BaseModel):
         # Load base config
         if bootstrap_path is not None:
             # Explicit bootstrap path - only load this file
-            with Path(bootstrap_path).open("rb") as f:
-                cfg = tomli.load(f)
+            cfg = loads_toml(Path(bootstrap_path).read_text(encoding="utf-8"))
         else:
-            # Use bundled default
-            with _DEFAULT_CONFIG_PATH.open("rb") as f:
-                cfg = tomli.load(f)
+            # Use bundled default (shared, don't modify it in place)
+            cfg = _load_default_config()
 
             # If no explicit bootstrap path, try to load user config overlay
             if user_config_path is None:
                 user_config_path = get_user_config_path()
 
         # Overlay user config if specified or found
+        sources = cfg.get("sources")
         if user_config_path is not None:
             user_path = Path(user_config_path)
             if user_path.exists():
-                with user_path.open("rb") as f:
-                    user_cfg = tomli.load(f)
-                    # Merge user config sources into base config
-                    if "sources" in user_cfg:
-                        if "sources" not in cfg:
-                            cfg["sources"] = {}
-                        cfg["sources"] = cfg["sources"] | user_cfg["sources"]
+                user_cfg = loads_toml(user_path.read_text(encoding="utf-8"))
+                # Merge user config sources into base config
+                if "sources" in user_cfg:
+                    sources = (sources or {}) | user_cfg["sources"]
 
         # inject source names if not explicitly provided
-        for name, src in cfg.get("sources", {}).items():
-            if "name" not in src:
-                src["name"] = name
+        if sources is not None:
+            sources = {name: {"name": name, **src} for name, src in sources.items()}
+            cfg = cfg | {"sources": sources}
 
         return cls(**cfg)
 
@@ -1224,11 +1234,10 @@ class PoochRegistry(ModelRegistry):
         existing_models = {}
         existing_examples = {}
         if registry_file.exists():
-            with registry_file.open("rb") as f:
-                existing_data = tomli.load(f)
-                existing_files = existing_data.get("files", {})
-                existing_models = existing_data.get("models", {})
-                existing_examples = existing_data.get("examples", {})
+            existing_data = loads_toml(registry_file.read_text(encoding="utf-8"))
+            existing_files = existing_data.get("files", {})
+            existing_models = existing_data.get("models", {})
+            existing_examples = existing_data.get("examples", {})
 
         # Merge with new data
         existing_files.update(files)
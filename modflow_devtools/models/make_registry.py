@@ -1,6 +1,9 @@
 import argparse
+import json
 import shutil
+import sys
 import tempfile
+from os import PathLike
 from pathlib import Path
 from urllib.request import urlopen
 from zipfile import ZipFile
@@ -75,6 +78,39 @@ def _download_repo(repo: str, ref: str, verbose: bool = False) -> Path:
         raise RuntimeError(f"Failed to download repository {repo}@{ref}: {e}") from e
 
 
+def construct_url(
+    repo: str,
+    ref: str,
+    path: str | None = None,
+    asset_file: str | None = None,
+) -> str:
+    """
+    Construct the base URL from which a registry's model files are fetched.
+
+    Parameters
+    ----------
+    repo : str
+        Repository in "owner/name" format
+    ref : str
+        Git ref (branch, tag, or commit hash), or release tag if `asset_file` is given
+    path : str, optional
+        Path of the models within the repository, defaults to the repository root.
+        Ignored for release assets.
+    asset_file : str, optional
+        Release asset filename. If provided, the URL points to the release asset
+        instead of version-controlled files.
+
+    Returns
+    -------
+    str
+        The release asset download URL, or the raw GitHub URL of the model directory
+    """
+    if asset_file:
+        return f"https://github.com/{repo}/releases/download/{ref}/{asset_file}"
+    path_suffix = f"/{path}" if path else ""
+    return f"https://raw.githubusercontent.com/{repo}/{ref}{path_suffix}"
+
+
 _DEFAULT_REGISTRY_OPTIONS = [
     {
         "path": _REPOS_PATH / "modflow6-examples" / "examples",
@@ -100,6 +136,67 @@ _DEFAULT_REGISTRY_OPTIONS = [
 ]
 
 
+def _detect_path_in_repo(path: str | PathLike, repo: str, verbose: bool = False) -> str:
+    """
+    Detect a local directory's path within a repository checkout from
+    the directory structure, i.e. everything after the repository name.
+
+    Parameters
+    ----------
+    path : str or PathLike
+        Local directory within a checkout of the repository
+    repo : str
+        Repository in "owner/name" format
+    verbose : bool
+        Print progress messages
+
+    Returns
+    -------
+    str
+        Path in the repository, or "" if at (or assumed to be) the repo root
+    """
+    path_parts = Path(path).resolve().parts
+    # Extract repository name from owner/repo format
+    repo_name = repo.split("/")[1]
+    try:
+        # Find the index of the repo name in the path
+        repo_index = path_parts.index(repo_name)
+    except ValueError:
+        # Repo name not found in path - assume repo root
+        if verbose:
+            print(f"Warning: Repository name '{repo_name}' not found in path, using repo root")
+        return ""
+
+    # Everything after the repo name is the path in repo
+    path_in_repo = "/".join(path_parts[repo_index + 1 :])
+    if verbose:
+        if path_in_repo:
+            print(f"Detected path in repo: '{path_in_repo}' (from directory structure)")
+        else:
+            print("Detected path in repo: '' (repo root)")
+    return path_in_repo
+
+
+def _registry_url(
+    repo: str,
+    ref: str,
+    path: str | None = None,
+    asset_file: str | None = None,
+    verbose: bool = False,
+) -> str:
+    """
+    Construct the URL for the registry's model files from the CLI options.
+    Release assets if `asset_file` is given, otherwise version-controlled
+    files under `path`, which is detected from the directory structure if
+    `path` is an existing local directory, or else used as a subpath.
+    """
+    if asset_file:
+        return construct_url(repo, ref, asset_file=asset_file)
+    if path and Path(path).is_dir():
+        path = _detect_path_in_repo(path, repo, verbose=verbose)
+    return construct_url(repo, ref, path=path)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Make a registry of models.",
@@ -203,16 +300,33 @@ Examples:
         action="store_true",
         help="Show verbose output.",
     )
+    parser.add_argument(
+        "--emit-json",
+        action="store_true",
+        help=(
+            'Print the constructed URL as JSON (e.g. {"constructed_url": ...}) '
+            "and exit without downloading or indexing models."
+        ),
+    )
     args = parser.parse_args()
 
     # Infer mode from presence of --asset-file
     mode = "release" if args.asset_file else "version"
 
+    url = _registry_url(
+        args.repo,
+        args.ref,
+        path=args.path,
+        asset_file=args.asset_file,
+        verbose=args.verbose and not args.emit_json,
+    )
+    if args.emit_json:
+        print(json.dumps({"constructed_url": url}))
+        sys.exit(0)
+
     # Determine the local path to index
     temp_dir = None
     index_path = None
-    path_in_repo = ""  # For URL construction
-    use_local_path = False
 
     try:
         if args.path:
@@ -221,7 +335,6 @@ Examples:
             if path_obj.exists() and path_obj.is_dir():
                 # It's a local path - use directly
                 index_path = args.path
-                use_local_path = True
                 if args.verbose:
                     print(f"Using local directory: {index_path}")
                     print(
@@ -238,8 +351,6 @@ Examples:
                             "--asset-file is required when mode=release and path not found locally"
                         )
 
-                    asset_url = f"https://github.com/{args.repo}/releases/download/{args.ref}/{args.asset_file}"
-
                     if args.verbose:
                         print(f"Path '{args.path}' not found locally")
                         print("Downloading and extracting release asset for indexing...")
@@ -247,7 +358,7 @@ Examples:
                     # Create temp directory and download/extract
                     temp_dir = Path(tempfile.mkdtemp(prefix="modflow-devtools-"))
                     extract_dir = download_and_unzip(
-                        asset_url, path=temp_dir, delete_zip=True, verbose=args.verbose
+                        url, path=temp_dir, delete_zip=True, verbose=args.verbose
                     )
 
                     # The release asset may have files at root or in a subdirectory
@@ -277,7 +388,6 @@ Examples:
                         raise RuntimeError(
                             f"Subpath '{args.path}' not found in downloaded repository"
                         )
-                    path_in_repo = args.path
 
                     if args.verbose:
                         print(f"Will index from: {index_path}")
@@ -288,10 +398,6 @@ Examples:
                 if not args.asset_file:
                     parser.error("--asset-file is required when mode=release")
 
-                asset_url = (
-                    f"https://github.com/{args.repo}/releases/download/{args.ref}/{args.asset_file}"
-                )
-
                 if args.verbose:
                     print(
                         "No path provided, downloading and extracting release asset from remote..."
@@ -300,7 +406,7 @@ Examples:
                 # Create temp directory and download/extract
                 temp_dir = Path(tempfile.mkdtemp(prefix="modflow-devtools-"))
                 index_path = download_and_unzip(
-                    asset_url, path=temp_dir, delete_zip=True, verbose=args.verbose
+                    url, path=temp_dir, delete_zip=True, verbose=args.verbose
                 )
 
                 if args.verbose:
@@ -317,55 +423,12 @@ Examples:
                 if args.verbose:
                     print(f"Will index from repo root: {index_path}")
 
-        # Validate arguments and construct URL
-        if mode == "version":
-            # If using local path, try to auto-detect path in repo from directory structure
-            if use_local_path:
-                path_obj = Path(index_path).resolve()
-                # Extract repository name from owner/repo format
-                repo_name = args.repo.split("/")[1]
-
-                # Look for the repo name in the path
-                path_parts = path_obj.parts
-                try:
-                    # Find the index of the repo name in the path
-                    repo_index = path_parts.index(repo_name)
-                    # Everything after the repo name is the path in repo
-                    if repo_index + 1 < len(path_parts):
-                        remaining_parts = path_parts[repo_index + 1 :]
-                        path_in_repo = "/".join(remaining_parts)
-                        if args.verbose:
-                            print(
-                                f"Detected path in repo: '{path_in_repo}' "
-                                "(from directory structure)"
-                            )
-                    else:
-                        # Path ends at repo name, so we're at repo root
-                        if args.verbose:
-                            print("Detected path in repo: '' (repo root)")
-                except ValueError:
-                    # Repo name not found in path - assume repo root
-                    if args.verbose:
-                        print(
-                            f"Warning: Repository name '{repo_name}' not found in path, "
-                            "using repo root"
-                        )
-
-            # Construct raw GitHub URL for version-controlled files
-            path_suffix = f"/{path_in_repo}" if path_in_repo else ""
-            url = f"https://raw.githubusercontent.com/{args.repo}/{args.ref}{path_suffix}"
-            if args.verbose:
+        if args.verbose:
+            if mode == "version":
                 print("Mode: version (version-controlled)")
-                print(f"Constructed URL: {url}")
-
-        elif mode == "release":
-            # Construct release download URL for release assets
-            if not args.asset_file:
-                parser.error("--asset-file is required when mode=release")
-            url = f"https://github.com/{args.repo}/releases/download/{args.ref}/{args.asset_file}"
-            if args.verbose:
+            else:
                 print("Mode: release (release asset)")
-                print(f"Constructed URL: {url}")
+            print(f"Constructed URL: {url}")
 
         # Index the models
         if args.verbose: